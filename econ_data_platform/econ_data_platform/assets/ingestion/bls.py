@@ -1,41 +1,66 @@
 import dagster as dg
 import polars as pl
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Iterator
 from econ_data_platform.resources.motherduck import MotherDuckResource
 
 census_api_key = dg.EnvVar("CENSUS_API_KEY")
 year_partition = dg.StaticPartitionsDefinition(
     [str(year) for year in range(1999, 2025)]
 )
+# Census years and cycles are independent requests, fetched concurrently up
+# to this many at a time within a single run
+CENSUS_MAX_WORKERS = 8
+
+
+def fetch_housing_inventory_year(year: str) -> pl.DataFrame:
+    """Fetch one year of housing vacancy data from the Census API."""
+    url = f"https://api.census.gov/data/timeseries/eits/hv?get=data_type_code,time_slot_id,seasonally_adj,category_code,cell_value,error_data&for=us:*&time={year}&key={census_api_key}"
+    response = requests.get(url)
+
+    columns, *rows = response.json()
+
+    return pl.DataFrame(rows, schema=columns, orient="row")
+
+
+def fetch_household_pulse_cycle(cycle: int) -> pl.DataFrame:
+    """Fetch one collection cycle of household pulse data from the Census API."""
+    url = f"https://api.census.gov/data/timeseries/hhpulse?get=SURVEY_YEAR,NAME,MEASURE_NAME,COL_START_DATE,COL_END_DATE,RATE,TOTAL,MEASURE_DESCRIPTION&for=state:*&time=2024&CYCLE=0{str(cycle)}&key={census_api_key}"
+    response = requests.get(url)
+
+    columns, *rows = response.json()
+
+    return pl.DataFrame(rows, schema=columns, orient="row")
 
 
 @dg.asset(
     group_name="ingestion",
     kinds={"polars", "duckdb"},
     partitions_def=year_partition,
+    backfill_policy=dg.BackfillPolicy.single_run(),
     description="Raw data from BLS API for housing inventory",
     automation_condition=dg.AutomationCondition.on_cron("0 0 * * 1"),
 )
 def housing_inventory_raw(
     context: dg.AssetExecutionContext, md: MotherDuckResource
 ) -> dg.MaterializeResult:
-    # Get the data from the Census API
-    year = context.partition_key
-
-    url = f"https://api.census.gov/data/timeseries/eits/hv?get=data_type_code,time_slot_id,seasonally_adj,category_code,cell_value,error_data&for=us:*&time={year}&key={census_api_key}"
-    response = requests.get(url)
+    # A backfill launches a single run covering every selected year
+    years = context.partition_keys
 
-    columns = response.json()[0]
-    rows = response.json()[1:]
+    with ThreadPoolExecutor(max_workers=CENSUS_MAX_WORKERS) as executor:
+        frames = list(executor.map(fetch_housing_inventory_year, years))
 
-    df = pl.DataFrame(rows, schema=columns, orient="row")
+    df = pl.concat(frames)
 
-    md.drop_create_duck_db_table("housing_inventory", df)
+    # Only replace the selected years so partial ranges keep the other years;
+    # Census reports time as YYYY or YYYY-Qn
+    md.replace_partitions("housing_inventory", df, "left(time, 4)", years)
 
     return dg.MaterializeResult(
         metadata={
-            "year": year,
+            "years": ", ".join(years),
             "num_records": len(df),
         }
     )
@@ -46,32 +71,40 @@ def housing_inventory_raw(
     kinds={"polars", "duckdb"},
     description="Raw data from BLS API for housing pulse",
     automation_condition=dg.AutomationCondition.on_cron("0 0 * * 1"),
+    output_required=False,
 )
 def housing_pulse_raw(
     context: dg.AssetExecutionContext, md: MotherDuckResource
-) -> dg.MaterializeResult:
-    main_df = pl.DataFrame()
-    iterator = True
-    while iterator:
-        for cycle in list(range(1, datetime.now().month)):
+) -> Iterator[dg.MaterializeResult]:
+    cycles = range(1, datetime.now().month)
+
+    # Keep results in cycle order up to the first cycle that has not been
+    # published yet. Later cycles already in flight still finish, but any
+    # not yet started are cancelled.
+    frames = []
+    with ThreadPoolExecutor(max_workers=CENSUS_MAX_WORKERS) as executor:
+        futures = [executor.submit(fetch_household_pulse_cycle, c) for c in cycles]
+        for cycle, future in zip(cycles, futures):
             try:
-                url = f"https://api.census.gov/data/timeseries/hhpulse?get=SURVEY_YEAR,NAME,MEASURE_NAME,COL_START_DATE,COL_END_DATE,RATE,TOTAL,MEASURE_DESCRIPTION&for=state:*&time=2024&CYCLE=0{str(cycle)}&key={census_api_key}"
-                response = requests.get(url)
-                columns = response.json()[0]
-                rows = response.json()[1:]
-                data = [dict(zip(columns, row)) for row in rows]
-                df = pl.DataFrame(data)
-                main_df = pl.concat([main_df, df])
+                frames.append(future.result())
             except Exception as e:
                 context.log.info(f"{str(cycle)}- series doesnt exist")
                 context.log.info(e)
+                executor.shutdown(cancel_futures=True)
                 break
 
-        break
+    # Nothing was written, so skip the materialization rather than report a
+    # refresh; the existing table is left as is
+    if not frames:
+        context.log.warning(
+            "No housing pulse cycles fetched, skipping housing_pulse_raw"
+        )
+        return
 
+    main_df = pl.concat(frames)
     md.drop_create_duck_db_table("housing_pulse_raw", main_df)
 
-    return dg.MaterializeResult(
+    yield dg.MaterializeResult(
         metadata={
             "num_records": len(main_df),
         }
@@ -1,12 +1,11 @@
+import os
 import dagster as dg
 from econ_data_platform.resources.motherduck import MotherDuckResource
 
 import polars as pl
-from io import StringIO
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from dataclasses import dataclass
-from collections.abc import Sequence
 
 from datetime import datetime
 
@@ -35,8 +34,8 @@ def realtor_asset_factory(file_definition: DriveFile) -> dg.Definitions:
         context.log.info(f"Reading file {file_name} from Google Drive")
         request = service.files().get_media(fileId=file_id)
         content = request.execute()
-        csv_string = content.decode("utf-8")
-        df = pl.read_csv(StringIO(csv_string))
+        # polars parses the raw bytes directly, no decoded copy needed
+        df = pl.read_csv(content)
         md.drop_create_duck_db_table(file_name, df)
 
         return dg.MaterializeResult(
@@ -65,8 +64,10 @@ def realtor_asset_factory(file_definition: DriveFile) -> dg.Definitions:
             service.files().get(fileId=file_id, fields="modifiedTime").execute()
         )
 
-        current_mtime = datetime.strptime(
-            file_metadata["modifiedTime"], "%Y-%m-%dT%H:%M:%S.%fZ"
+        # Drive returns RFC 3339 timestamps ("...T10:20:30.123Z"); fromisoformat
+        # parses them without strptime's per-call format parsing
+        current_mtime = datetime.fromisoformat(
+            file_metadata["modifiedTime"].rstrip("Z")
         ).timestamp()
 
         # If file has been modified, trigger the job
@@ -88,7 +89,7 @@ credentials = service_account.Credentials.from_service_account_file(
     "creds.json", scopes=SCOPES
 )
 service = build("drive", "v3", credentials=credentials)
-folder_id = os.environ("GOOGLE_DRIVE_FOLDER_ID")
+folder_id = os.environ["GOOGLE_DRIVE_FOLDER_ID"]
 
 # Get files from folder
 query = f"'{folder_id}' in parents and mimeType='text/csv'"
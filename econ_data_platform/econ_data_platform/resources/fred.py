@@ -25,7 +25,7 @@ class FredResource(dg.ConfigurableResource):
         return (
             df.drop(["realtime_start", "realtime_end"])
             .with_columns(
-                pl.col("date").str.strptime(pl.Date),
+                pl.col("date").str.strptime(pl.Date, "%Y-%m-%d"),
                 pl.when(pl.col("value") == ".")
                 .then(None)
                 .otherwise(pl.col("value"))
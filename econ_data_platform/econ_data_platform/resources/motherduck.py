@@ -1,9 +1,20 @@
 import duckdb
 import polars as pl
 import dagster as dg
-from typing import List, Union
+from contextlib import contextmanager
+from typing import Iterator, List, Union
 from pydantic import Field
 
+POLARS_TO_DUCKDB_TYPES = {
+    pl.Int32: "INTEGER",
+    pl.Int64: "INTEGER",
+    pl.Float32: "DOUBLE",
+    pl.Float64: "DOUBLE",
+    pl.Boolean: "BOOLEAN",
+    pl.Date: "TIMESTAMP",
+    pl.Datetime: "TIMESTAMP",
+}
+
 
 class MotherDuckResource(dg.ConfigurableResource):
     """A Dagster resource for managing MotherDuck database connections and operations."""
@@ -26,44 +37,80 @@ class MotherDuckResource(dg.ConfigurableResource):
         """
         conn = duckdb.connect(self.db_connection, read_only=read_only)
         conn.execute("USE prod_econ.main")
-        conn.commit()
         return conn
 
+    @contextmanager
+    def connection(
+        self, read_only: bool = False
+    ) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Open a connection for the duration of a block and close it afterwards.
+
+        Lets callers run several statements over one connection instead of
+        reconnecting for each.
+
+        Args:
+            read_only (bool): Whether to open the connection in read-only mode
+        """
+        conn = self.get_connection(read_only=read_only)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
     def drop_create_duck_db_table(
         self, table_name: str, df: Union[pl.DataFrame, duckdb.DuckDBPyRelation]
     ):
         """Drop and recreate a table with the provided DataFrame data."""
-        conn = None
-        try:
-            conn = self.get_connection(read_only=False)
+        with self.connection(read_only=False) as conn:
+            # Swap the table in one transaction so readers never see it missing
+            conn.begin()
             conn.execute(f"DROP TABLE IF EXISTS {table_name}")
             conn.execute(f"CREATE TABLE {table_name} AS SELECT * FROM df")
             conn.commit()
-        finally:
-            if conn:
-                conn.close()
+        return self.db_connection
+
+    def replace_partitions(
+        self,
+        table_name: str,
+        df: pl.DataFrame,
+        partition_expr: str,
+        partition_keys: List[str],
+    ):
+        """Replace the rows for the given partitions, leaving all others untouched.
+
+        Args:
+            table_name (str): Table to write to, created from ``df`` if missing
+            df (pl.DataFrame): New data for the partitions being replaced
+            partition_expr (str): SQL expression giving each row's partition key
+            partition_keys (List[str]): Partition keys whose rows are replaced
+        """
+        with self.connection(read_only=False) as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table_name} AS SELECT * FROM df LIMIT 0"
+            )
+
+            # Delete and insert in one transaction so readers never see the
+            # partitions missing
+            conn.begin()
+            conn.execute(
+                f"DELETE FROM {table_name} WHERE list_contains(?, {partition_expr})",
+                [list(partition_keys)],
+            )
+            conn.execute(f"INSERT INTO {table_name} SELECT * FROM df")
+            conn.commit()
         return self.db_connection
 
     @staticmethod
     def map_dtype(dtype: pl.DataType) -> str:
         """Map Polars data types to DuckDB data types."""
-        type_mapping = {
-            pl.Int32: "INTEGER",
-            pl.Int64: "INTEGER",
-            pl.Float32: "DOUBLE",
-            pl.Float64: "DOUBLE",
-            pl.Boolean: "BOOLEAN",
-            pl.Date: "TIMESTAMP",
-            pl.Datetime: "TIMESTAMP",
-        }
-        return type_mapping.get(type(dtype), "VARCHAR")
+        return POLARS_TO_DUCKDB_TYPES.get(type(dtype), "VARCHAR")
 
     def upsert_data(self, table_name: str, data: pl.DataFrame, key_columns: List[str]):
         """Upsert data into a table based on key columns."""
-        conn = None
-        try:
-            conn = self.get_connection(read_only=False)
+        if data.is_empty():
+            return
 
+        with self.connection(read_only=False) as conn:
             # Create table if it doesn't exist
             create_table_query = f"""
             CREATE TABLE IF NOT EXISTS {table_name} (
@@ -77,6 +124,14 @@ class MotherDuckResource(dg.ConfigurableResource):
                 f"CREATE TEMPORARY TABLE temp_{table_name} AS SELECT * FROM data"
             )
 
+            key_match = " AND ".join(
+                [f"{table_name}.{col} = temp_{table_name}.{col}" for col in key_columns]
+            )
+
+            # Apply update and insert as one transaction with a single commit;
+            # the temp table lives outside it as it belongs to another catalog
+            conn.begin()
+
             # Update existing rows
             non_key_columns = [col for col in data.columns if col not in key_columns]
             if non_key_columns:
@@ -84,7 +139,7 @@ class MotherDuckResource(dg.ConfigurableResource):
                 UPDATE {table_name}
                 SET {", ".join([f"{col} = temp_{table_name}.{col}" for col in non_key_columns])}
                 FROM temp_{table_name}
-                WHERE {" AND ".join([f"{table_name}.{col} = temp_{table_name}.{col}" for col in key_columns])}
+                WHERE {key_match}
                 """
                 conn.execute(update_query)
 
@@ -94,17 +149,14 @@ class MotherDuckResource(dg.ConfigurableResource):
             SELECT * FROM temp_{table_name}
             WHERE NOT EXISTS (
                 SELECT 1 FROM {table_name}
-                WHERE {" AND ".join([f"{table_name}.{col} = temp_{table_name}.{col}" for col in key_columns])}
+                WHERE {key_match}
             )
             """
             conn.execute(insert_query)
+            conn.commit()
 
             # Clean up
             conn.execute(f"DROP TABLE temp_{table_name}")
-            conn.commit()
-        finally:
-            if conn:
-                conn.close()
 
 
 motherduck_resource = MotherDuckResource(
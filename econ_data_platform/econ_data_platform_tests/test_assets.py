@@ -1 +1,96 @@
+import dagster as dg
+import duckdb
+import polars as pl
+import pytest
 
+from econ_data_platform.assets.ingestion import bls
+from econ_data_platform.resources.motherduck import MotherDuckResource
+
+
+class LocalMotherDuckResource(MotherDuckResource):
+    """MotherDuckResource backed by a local DuckDB file instead of MotherDuck."""
+
+    db_path: str
+
+    def get_connection(self, read_only: bool = False) -> duckdb.DuckDBPyConnection:
+        return duckdb.connect(self.db_path, read_only=read_only)
+
+
+@pytest.fixture
+def md(tmp_path):
+    return LocalMotherDuckResource(
+        md_token="test",
+        md_database="test",
+        md_schema="main",
+        db_path=str(tmp_path / "test.duckdb"),
+    )
+
+
+def fake_housing_inventory(cell_value: str):
+    def fetch(year: str) -> pl.DataFrame:
+        return pl.DataFrame(
+            {
+                "data_type_code": ["RVR", "HOR"],
+                "cell_value": [cell_value, cell_value],
+                "time": [f"{year}-Q1", f"{year}-Q2"],
+                "us": ["1", "1"],
+            }
+        )
+
+    return fetch
+
+
+def read_housing_inventory(md: LocalMotherDuckResource) -> pl.DataFrame:
+    with md.connection(read_only=True) as conn:
+        return conn.execute(
+            "SELECT time, cell_value FROM housing_inventory ORDER BY time"
+        ).pl()
+
+
+def test_housing_inventory_raw_replaces_only_selected_years(md, monkeypatch):
+    monkeypatch.setattr(
+        bls, "fetch_housing_inventory_year", fake_housing_inventory("old")
+    )
+    result = dg.materialize(
+        [bls.housing_inventory_raw],
+        resources={"md": md},
+        tags={
+            "dagster/asset_partition_range_start": "2020",
+            "dagster/asset_partition_range_end": "2022",
+        },
+    )
+    assert result.success
+
+    df = read_housing_inventory(md)
+    assert len(df) == 6
+    assert df["cell_value"].to_list() == ["old"] * 6
+
+    monkeypatch.setattr(
+        bls, "fetch_housing_inventory_year", fake_housing_inventory("new")
+    )
+    result = dg.materialize(
+        [bls.housing_inventory_raw], resources={"md": md}, partition_key="2021"
+    )
+    assert result.success
+
+    df = read_housing_inventory(md)
+    assert len(df) == 6
+    assert dict(zip(df["time"], df["cell_value"])) == {
+        "2020-Q1": "old",
+        "2020-Q2": "old",
+        "2021-Q1": "new",
+        "2021-Q2": "new",
+        "2022-Q1": "old",
+        "2022-Q2": "old",
+    }
+
+
+def test_housing_pulse_raw_skips_materialization_without_data(md, monkeypatch):
+    def fetch(cycle: int) -> pl.DataFrame:
+        raise ValueError("cycle not published")
+
+    monkeypatch.setattr(bls, "fetch_household_pulse_cycle", fetch)
+    result = dg.materialize([bls.housing_pulse_raw], resources={"md": md})
+
+    assert result.success
+    assert result.get_asset_materialization_events() == []
@@ -4,16 +4,13 @@ from dotenv import load_dotenv
 import os
 from utils import drop_create_duck_db_table
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # Load environment variables from .env file
 load_dotenv()
 
-
-def get_housing_inventory(census_api_key):
-    # Get the data from the Census API
-    year_list = list(range(1999, 2025))
-    main_df = pl.DataFrame()
-    mapping_dict = {
+# Map data_type_code to a readable series name
+SERIES_NAME_MAPPING = {
     'RENT': 'Vacant Housing Units For Rent',
     'URE': 'Vacant Housing Units Held off the Market and Usual Residence Elsewhere',
     'RVR': 'Rental Vacancy Rate',
@@ -35,53 +32,63 @@ def get_housing_inventory(census_api_key):
     'SALE': 'Vacant Housing Units For Sale',
     'SEASON': 'Seasonal Vacant Housing Units',
     'TOTAL': 'Total Housing Units'
-    }
-    # Define the second mapping dictionary for 'series_name' to 'Plot groupings'
-    series_name_to_plot_groupings = {
-        'Error Homeowner Vacancy Rate': 'Error',
-        'Error Homeownership Rate': 'Error',
-        'Error Rental Vacancy Rate': 'Error',
-        'Owner Occupied Units': 'Occupied Inventory',
-        'Renter Occupied Units': 'Occupied Inventory',
-        'Total Housing Units': 'Total Housing Units',
-        'Total Occupied housing Units': 'Total Housing Units',
-        'Total Vacant Housing Units': 'Total Housing Units',
-        'Held Off the Market and for Occasional Use': 'Vacant Inventory',
-        'Held off the Market and Vacant for Other Reasons Vacant Housing Units': 'Vacant Inventory',
-        'Held Off the Market Vacant Housing Units': 'Vacant Inventory',
-        'Rented or Sold, Not Yet Occupied Vacant Housing Units': 'Vacant Inventory',
-        'Seasonal Vacant Housing Units': 'Vacant Inventory',
-        'Vacant Housing Units For Rent': 'Vacant Inventory',
-        'Vacant Housing Units For Sale': 'Vacant Inventory',
-        'Vacant Housing Units Held off the Market and Usual Residence Elsewhere': 'Vacant Inventory',
-        'Year-Round Vacant Housing Units': 'Vacant Inventory',
-        'Homeowner Vacancy Rate': 'Rates',
-        'Homeownership Rate': 'Rates',
-        'Rental Vacancy Rate': 'Rates',
-        'Seasonal Adjusted Home Owner Rate': 'Rates'
-    }
-    for year in year_list:
-
-    
-        url = f'https://api.census.gov/data/timeseries/eits/hv?get=data_type_code,time_slot_id,seasonally_adj,category_code,cell_value,error_data&for=us:*&time={year}&key={census_api_key}'
-        response = requests.get(url)
-  
-        # need to convert the json to a dataframe
-        columns = response.json()[0]
-        rows = response.json()[1:]
-
-        # Create DataFrame
-        df = pl.DataFrame(rows, schema=columns, orient="row")
-        # appending the df to the main_df
-        main_df = pl.concat([main_df, df])
+}
+# Define the second mapping dictionary for 'series_name' to 'Plot groupings'
+PLOT_GROUPINGS_MAPPING = {
+    'Error Homeowner Vacancy Rate': 'Error',
+    'Error Homeownership Rate': 'Error',
+    'Error Rental Vacancy Rate': 'Error',
+    'Owner Occupied Units': 'Occupied Inventory',
+    'Renter Occupied Units': 'Occupied Inventory',
+    'Total Housing Units': 'Total Housing Units',
+    'Total Occupied housing Units': 'Total Housing Units',
+    'Total Vacant Housing Units': 'Total Housing Units',
+    'Held Off the Market and for Occasional Use': 'Vacant Inventory',
+    'Held off the Market and Vacant for Other Reasons Vacant Housing Units': 'Vacant Inventory',
+    'Held Off the Market Vacant Housing Units': 'Vacant Inventory',
+    'Rented or Sold, Not Yet Occupied Vacant Housing Units': 'Vacant Inventory',
+    'Seasonal Vacant Housing Units': 'Vacant Inventory',
+    'Vacant Housing Units For Rent': 'Vacant Inventory',
+    'Vacant Housing Units For Sale': 'Vacant Inventory',
+    'Vacant Housing Units Held off the Market and Usual Residence Elsewhere': 'Vacant Inventory',
+    'Year-Round Vacant Housing Units': 'Vacant Inventory',
+    'Homeowner Vacancy Rate': 'Rates',
+    'Homeownership Rate': 'Rates',
+    'Rental Vacancy Rate': 'Rates',
+    'Seasonal Adjusted Home Owner Rate': 'Rates'
+}
+# Census years and cycles are independent requests, fetched concurrently up to this many at a time
+CENSUS_MAX_WORKERS = 8
+
+
+def fetch_housing_inventory_year(census_api_key, year):
+    url = f'https://api.census.gov/data/timeseries/eits/hv?get=data_type_code,time_slot_id,seasonally_adj,category_code,cell_value,error_data&for=us:*&time={year}&key={census_api_key}'
+    response = requests.get(url)
+
+    # need to convert the json to a dataframe
+    columns, *rows = response.json()
+
+    # Create DataFrame
+    return pl.DataFrame(rows, schema=columns, orient="row")
+
+
+def get_housing_inventory(census_api_key):
+    # Get the data from the Census API
+    year_list = list(range(1999, 2025))
+
+    with ThreadPoolExecutor(max_workers=CENSUS_MAX_WORKERS) as executor:
+        frames = list(executor.map(lambda year: fetch_housing_inventory_year(census_api_key, year), year_list))
+
+    # concatenating once avoids re-copying the accumulated frame every year
+    main_df = pl.concat(frames)
 
     # Create the new column by mapping 'data_type_code' to 'Series Name'
     main_df = main_df.with_columns(
-        pl.col('data_type_code').replace(mapping_dict).alias('series_name')
+        pl.col('data_type_code').replace(SERIES_NAME_MAPPING).alias('series_name')
     )
 
     main_df = main_df.with_columns(
-        pl.col('series_name').replace(series_name_to_plot_groupings).alias('plot_groupings')
+        pl.col('series_name').replace(PLOT_GROUPINGS_MAPPING).alias('plot_groupings')
     )
 
     # This dataframe is also saved as a duckdb table in the sources folder as economic_data.duckdb
@@ -90,26 +97,36 @@ def get_housing_inventory(census_api_key):
     return 'housing_inventory added to database'
 
 
+def fetch_household_pulse_cycle(census_api_key, cycle):
+    url = f'https://api.census.gov/data/timeseries/hhpulse?get=SURVEY_YEAR,NAME,MEASURE_NAME,COL_START_DATE,COL_END_DATE,RATE,TOTAL,MEASURE_DESCRIPTION&for=state:*&time=2024&CYCLE=0{str(cycle)}&key={census_api_key}'
+    response = requests.get(url)
+    columns, *rows = response.json()
+    return pl.DataFrame(rows, schema=columns, orient="row")
+
+
 def get_household_pulse(census_api_key):
-    main_df = pl.DataFrame()
-    iterator = True
-    while iterator:
-        for cycle in list(range(1, datetime.now().month)):
+    cycles = range(1, datetime.now().month)
+
+    # keep results in cycle order up to the first cycle that is missing;
+    # cycles after it that have not started yet are cancelled
+    frames = []
+    with ThreadPoolExecutor(max_workers=CENSUS_MAX_WORKERS) as executor:
+        futures = [executor.submit(fetch_household_pulse_cycle, census_api_key, cycle) for cycle in cycles]
+        for cycle, future in zip(cycles, futures):
             try:
-                url = f'https://api.census.gov/data/timeseries/hhpulse?get=SURVEY_YEAR,NAME,MEASURE_NAME,COL_START_DATE,COL_END_DATE,RATE,TOTAL,MEASURE_DESCRIPTION&for=state:*&time=2024&CYCLE=0{str(cycle)}&key={census_api_key}'
-                response = requests.get(url)
-                columns = response.json()[0]
-                rows = response.json()[1:]
-                data = [dict(zip(columns, row)) for row in rows]
-                df = pl.DataFrame(data)
-                main_df = pl.concat([main_df, df])
+                frames.append(future.result())
             except Exception as e:
                 print('series doesnt exist')
                 print(cycle)
                 print(e)
+                executor.shutdown(cancel_futures=True)
                 break
-            
-        break
+
+    # keep the existing table rather than replacing it with nothing
+    if not frames:
+        return 'no housing pulse data fetched, table left unchanged'
+
+    main_df = pl.concat(frames)
     print(f'fetched {len(main_df)} rows for housing pulse')       
     drop_create_duck_db_table('housing_pulse', main_df)
 
@@ -2,10 +2,14 @@ import polars as pl
 from dotenv import load_dotenv 
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from utils import upsert_data
 
 load_dotenv()
 
+# FRED series are independent requests, fetched concurrently up to this many at a time
+FRED_MAX_WORKERS = 8
+
 def get_fred_data(series_code, series_name, key):
 
     url = f"https://api.stlouisfed.org/fred/series/observations?series_id={series_code}&api_key={key}&file_type=json&"
@@ -20,7 +24,7 @@ def get_fred_data(series_code, series_name, key):
     )
     df = df.drop(['realtime_start', 'realtime_end'])
     df = df.with_columns(
-        pl.col('date').str.strptime(pl.Date),
+        pl.col('date').str.strptime(pl.Date, '%Y-%m-%d'),
         pl.when(pl.col('value') == '.').then(None).otherwise(pl.col('value')).cast(pl.Float64)
     )
     df = df.drop_nulls('value')
@@ -44,10 +48,14 @@ def main():
             ("MEHOINUSA672N", "Real Median Household Income in the United States")]
 
 
-    for series_code, series_name in series:
-        data = get_fred_data(series_code, series_name, fred_api_key)
-        upsert_data('fred_data', data, ['date', 'series_code'])
-        print(f"Updated table: {series_name}")
+    series_codes, series_names = zip(*series)
+    with ThreadPoolExecutor(max_workers=FRED_MAX_WORKERS) as executor:
+        frames = list(executor.map(get_fred_data, series_codes, series_names, [fred_api_key] * len(series)))
+
+    # a single upsert for every series instead of one MotherDuck round-trip each
+    data = pl.concat(frames)
+    upsert_data('fred_data', data, ['date', 'series_code'])
+    print(f"Updated table: fred_data ({len(frames)} series)")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,17 +1,22 @@
 import os
-from utils import load_csv_data_to_duck_db
+from utils import load_csv_data_to_duck_db, connection
 import re
 
+# Table name is the part of the file name before _History.csv
+HISTORY_FILE_PATTERN = re.compile(r'(.+)_History\.csv')
+
 def main():
-    # Find all the CSVs in the data folder that start with RDC and add them as a table to the DuckDB database
-    for file in os.listdir('data'):
-        if file.startswith('RDC') and file.endswith('.csv'):
-            # For the table name, extract the word before _History.csv using regular expression
-            match = re.search(r'(.+)_History.csv', file)
-            if match:
-                table_name = match.group(1)
-                print("Updated table: ", table_name)
-                load_csv_data_to_duck_db(table_name, os.path.join('data', file))
+    # Open MotherDuck once and load every file over the same connection
+    with connection() as conn:
+        # Find all the CSVs in the data folder that start with RDC and add them as a table to the DuckDB database
+        for file in os.listdir('data'):
+            if file.startswith('RDC') and file.endswith('.csv'):
+                # For the table name, extract the word before _History.csv using regular expression
+                match = HISTORY_FILE_PATTERN.search(file)
+                if match:
+                    table_name = match.group(1)
+                    print("Updated table: ", table_name)
+                    load_csv_data_to_duck_db(table_name, os.path.join('data', file), conn=conn)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
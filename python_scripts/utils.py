@@ -1,4 +1,5 @@
 import duckdb
+from contextlib import contextmanager
 import polars as pl
 from dotenv import load_dotenv
 import os
@@ -10,6 +11,16 @@ db_connection = f'md:?motherduck_token={md_token}'
 
 #db_path = 'evidence_project/sources/econ/econ_db.duckdb'
 
+@contextmanager
+def connection(read_only=False):
+    # Open one MotherDuck connection for a block of work and close it afterwards
+    conn = duckdb.connect(db_connection, read_only=read_only)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
 def drop_create_duck_db_table(table_name, df):
     # Define the database path
 
@@ -17,7 +28,8 @@ def drop_create_duck_db_table(table_name, df):
     # Connect to the DuckDB database
         conn = duckdb.connect(db_connection, read_only=False)
         # need
-        # Replace the table in the DuckDB database with the data from the DataFrame
+        # Replace the table in one transaction so readers never see it missing
+        conn.begin()
         conn.execute(f'DROP TABLE IF EXISTS {table_name}')
         conn.execute(f'CREATE TABLE {table_name} AS SELECT * FROM df')
         # Save the DuckDB file
@@ -33,42 +45,60 @@ def drop_create_duck_db_table(table_name, df):
     return db_connection
 
 
-def load_csv_data_to_duck_db(table_name, csv_file_path):
+def load_csv_data_to_duck_db(table_name, csv_file_path, conn=None):
     # Define the database path
     csv_file_path = csv_file_path.replace('\\', '/')
 
+    # Callers loading several files can pass one open connection to reuse
+    owns_conn = conn is None
     try:
     # Connect to the DuckDB database
-        conn = duckdb.connect(db_connection, read_only=False)
-        # Replace the table in the DuckDB database with the data from the DataFrame
-        conn.execute(f'DROP TABLE IF EXISTS {table_name}')
-        conn.execute(f"CREATE TABLE {table_name} AS SELECT * FROM read_csv_auto('{csv_file_path}')")
-        # Save the DuckDB file
-        conn.commit()
+        if owns_conn:
+            conn = duckdb.connect(db_connection, read_only=False)
+        # Replace the table in one transaction so a CSV that fails to load
+        # leaves the old table in place
+        conn.begin()
+        try:
+            conn.execute(f'DROP TABLE IF EXISTS {table_name}')
+            # Let DuckDB take the path as a value rather than splicing it into SQL
+            conn.read_csv(csv_file_path).create(table_name)
+            # Save the DuckDB file
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
     except Exception as e:
         print(e)
     finally:
+        if owns_conn and conn is not None:
+            conn.close()
 
+    return db_connection
 
-        conn.close()
 
-    return db_connection
+POLARS_TO_DUCKDB_TYPES = {
+    pl.Int32: 'INTEGER',
+    pl.Int64: 'INTEGER',
+    pl.Float32: 'DOUBLE',
+    pl.Float64: 'DOUBLE',
+    pl.Boolean: 'BOOLEAN',
+    pl.Date: 'TIMESTAMP',
+    pl.Datetime: 'TIMESTAMP',
+}
 
 
 def map_dtype(dtype):
-    if dtype == pl.Int32 or dtype == pl.Int64:
-        return 'INTEGER'
-    elif dtype == pl.Float32 or dtype == pl.Float64:
-        return 'DOUBLE'
-    elif dtype == pl.Boolean:
-        return 'BOOLEAN'
-    elif dtype == pl.Date or dtype == pl.Datetime:
-        return 'TIMESTAMP'
-    else:
-        return 'VARCHAR'
-    
+    # one dict lookup on the dtype class instead of walking an if/elif chain;
+    # accepts both dtype instances (pl.Int64()) and the classes (pl.Int64)
+    dtype_class = dtype if isinstance(dtype, type) else type(dtype)
+    return POLARS_TO_DUCKDB_TYPES.get(dtype_class, 'VARCHAR')
+
 
 def upsert_data(table_name, data, key_columns):
+    # nothing to write, skip the connection and statements entirely
+    if data.is_empty():
+        return
+
     # Connect to DuckDB
     conn = duckdb.connect(database=db_connection, read_only=False)
     
@@ -83,14 +113,21 @@ def upsert_data(table_name, data, key_columns):
     # Create a temporary table for the new data
     conn.execute(f"CREATE TEMPORARY TABLE temp_{table_name} AS SELECT * FROM data")
     
-    # Update existing rows
-    update_query = f"""
-    UPDATE {table_name}
-    SET {', '.join([f'{col} = temp_{table_name}.{col}' for col in data.columns if col not in key_columns])}
-    FROM temp_{table_name}
-    WHERE { ' AND '.join([f'{table_name}.{col} = temp_{table_name}.{col}' for col in key_columns]) }
-    """
-    conn.execute(update_query)
+    key_match = ' AND '.join([f'{table_name}.{col} = temp_{table_name}.{col}' for col in key_columns])
+
+    # apply update and insert as one transaction with a single commit
+    conn.begin()
+
+    # Update existing rows, skipped when every column is part of the key
+    non_key_columns = [col for col in data.columns if col not in key_columns]
+    if non_key_columns:
+        update_query = f"""
+        UPDATE {table_name}
+        SET {', '.join([f'{col} = temp_{table_name}.{col}' for col in non_key_columns])}
+        FROM temp_{table_name}
+        WHERE {key_match}
+        """
+        conn.execute(update_query)
     
     # Insert new rows
     insert_query = f"""
@@ -98,10 +135,11 @@ def upsert_data(table_name, data, key_columns):
     SELECT * FROM temp_{table_name}
     WHERE NOT EXISTS (
         SELECT 1 FROM {table_name}
-        WHERE { ' AND '.join([f'{table_name}.{col} = temp_{table_name}.{col}' for col in key_columns]) }
+        WHERE {key_match}
     )
     """
     conn.execute(insert_query)
+    conn.commit()
     
     # Drop the temporary table
     conn.execute(f"DROP TABLE temp_{table_name}")